@@ -13,7 +13,7 @@
 """Base for Classifier benchmarks."""
 
 from abc import ABC
-from typing import Tuple, Optional, Union
+from typing import Any, Dict, Tuple, Optional, Union
 
 import numpy as np
 from qiskit import Aer
@@ -41,18 +41,23 @@ class BaseClassifierBenchmark(ABC):
         synthetic_label_encoder: Optional[Union[TransformerMixin, Pipeline]] = None,
         iris_num_classes: int = 3,
         iris_label_encoder: Optional[Union[TransformerMixin, Pipeline]] = None,
+        quantum_instance_options: Optional[Dict[str, Any]] = None,
     ):
         algorithm_globals.random_seed = 12345
+        # extra keyword arguments passed to both quantum instances
+        quantum_instance_options = quantum_instance_options or {}
         quantum_instance_statevector = QuantumInstance(
             Aer.get_backend("statevector_simulator"),
             seed_simulator=algorithm_globals.random_seed,
             seed_transpiler=algorithm_globals.random_seed,
+            **quantum_instance_options,
         )
         quantum_instance_qasm = QuantumInstance(
             Aer.get_backend("qasm_simulator"),
             shots=1024,
             seed_simulator=algorithm_globals.random_seed,
             seed_transpiler=algorithm_globals.random_seed,
+            **quantum_instance_options,
         )
 
         self.backends = {
@@ -14,16 +14,16 @@
 from abc import ABC
 from typing import Optional
 
+import numpy as np
 from qiskit_machine_learning.kernels import QuantumKernel
 from qiskit import QuantumCircuit
 from qiskit.circuit import ParameterVector, Parameter
 
 from qiskit.algorithms.optimizers import Optimizer
 from qiskit.circuit.library import ZZFeatureMap
+from qiskit.quantum_info import Statevector
 from qiskit.utils import algorithm_globals
 from qiskit_machine_learning.algorithms import NeuralNetworkClassifier, PegasosQSVC
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder, FunctionTransformer
 
 from .base_classifier_benchmark import BaseClassifierBenchmark
 
@@ -32,12 +32,12 @@ class PegasosQsvcBaseClassifierBenchmark(BaseClassifierBenchmark, ABC):
     """Base class for PegasosQSVC benchmark"""
 
     def __init__(self) -> None:
-        reshaper = FunctionTransformer(lambda x: x.reshape(-1, 1))
-        encoder = OneHotEncoder(sparse=False)
+        #PegasosQSVC takes plain 1D binary labels, so keep the default identity label encoders
         super().__init__(
-            synthetic_label_encoder=Pipeline([("reshape", reshaper), ("one hot", encoder)]),
             iris_num_classes=2,
-            iris_label_encoder=Pipeline([("reshape", reshaper), ("one hot", encoder)]),
+            #kernel circuits are tiny, heavier transpilation only adds overhead; this only matters
+            #for qasm, statevector kernels are computed from Statevector without executing
+            quantum_instance_options={"optimization_level": 0},
         )
 
     #I just built 1 function for method, I don't want to differentiate datasets
@@ -72,8 +72,7 @@ class PegasosQsvcBaseClassifierBenchmark(BaseClassifierBenchmark, ABC):
             #<<<<<<<<<<<<<<<<< any number of qubits
             user_params = ParameterVector("θ", 1)
             fm0 = QuantumCircuit(num_inputs)
-            for i in range(num_inputs):
-                fm0.ry(user_params[0], i)
+            fm0.ry(user_params[0], range(num_inputs))
             fm1 = ZZFeatureMap(num_inputs, reps=2, entanglement="linear")
             feature_map = fm0.compose(fm1)
             #quantum kernel, parametrized
@@ -82,6 +81,43 @@ class PegasosQsvcBaseClassifierBenchmark(BaseClassifierBenchmark, ABC):
         else:
             return ValueError(f"Unsupported method: {method}")
 
+    def _evaluate_kernel_matrix(
+        self,
+        kernel: QuantumKernel,
+        x_vec: np.ndarray,
+        y_vec: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Evaluate the kernel matrix"""
+        #duplicated samples would simulate identical circuits, evaluate unique rows only
+        x_unique, x_inverse = np.unique(x_vec, axis=0, return_inverse=True)
+        if y_vec is None:
+            y_unique, y_inverse = x_unique, x_inverse
+        else:
+            y_unique, y_inverse = np.unique(y_vec, axis=0, return_inverse=True)
+        if kernel.quantum_instance.is_statevector and not kernel.user_parameters:
+            #exact overlaps: simulate each sample once and take all the inner products at once
+            x_states = self._feature_map_statevectors(kernel, x_unique)
+            if y_vec is None:
+                y_states = x_states
+            else:
+                y_states = self._feature_map_statevectors(kernel, y_unique)
+            kernel_matrix = np.abs(x_states.conj() @ y_states.T) ** 2
+        else:
+            #QuantumKernel runs all the circuits in batched jobs and evaluates only one triangle
+            #of a symmetric matrix
+            kernel_matrix = kernel.evaluate(
+                x_vec=x_unique, y_vec=None if y_vec is None else y_unique
+            )
+        #scatter the unique entries back to the original sample order
+        return kernel_matrix[np.ix_(x_inverse, y_inverse)]
+
+    @staticmethod
+    def _feature_map_statevectors(kernel: QuantumKernel, x_vec: np.ndarray) -> np.ndarray:
+        """Return the feature map statevectors of the samples as rows of a complex matrix"""
+        return np.array(
+            [Statevector(kernel.feature_map.assign_parameters(x)).data for x in x_vec]
+        )
+
     def _construct_PegasosQsvc(
         self,
         num_inputs: int,
@@ -103,8 +139,7 @@ class PegasosQsvcBaseClassifierBenchmark(BaseClassifierBenchmark, ABC):
             #<<<<<<<<<<<<<<<<< any number of qubits
             user_params = ParameterVector("θ", 1)
             fm0 = QuantumCircuit(num_inputs)
-            for i in range(num_inputs):
-                fm0.ry(user_params[0], i)
+            fm0.ry(user_params[0], range(num_inputs))
             fm1 = ZZFeatureMap(num_inputs, reps=2, entanglement="linear")
             feature_map = fm0.compose(fm1)
             #quantum kernel, parametrized
@@ -11,25 +11,28 @@
 # that they have been altered from the originals.
 """Pegasos Quantum Support Vector Classifier benchmarks."""
 import pickle
+from functools import cached_property
 from itertools import product
 from timeit import timeit
-from typing import Optional, Union
-from qiskit_machine_learning.kernels import QuantumKernel
+from typing import Dict, Optional, Tuple
 
 import numpy as np
 from qiskit.algorithms.optimizers import COBYLA
 from qiskit_machine_learning.algorithms import PegasosQSVC
-from sklearn.metrics import precision_score, recall_score, f1_score
-from sympy import evaluate
+from sklearn.metrics import accuracy_score, precision_recall_fscore_support
 
 from .base_classifier_benchmark import DATASET_SYNTHETIC_CLASSIFICATION, DATASET_IRIS_CLASSIFICATION
 from .pegasosQsvc_base_benchmark import PegasosQsvcBaseClassifierBenchmark
 
+# PegasosQSVC adds this offset to quantum kernel values as its bias term, but not to a
+# precomputed kernel; add it explicitly so the model matches one fitted on the quantum kernel
+PEGASOS_KERNEL_OFFSET = 1.0
+
 
 class PegasosQsvcBenchmarks(PegasosQsvcBaseClassifierBenchmark):
     """Pegasos Quantum Support Vector Classifier benchmarks."""
 
-    version = 1
+    version = 2
     timeout = 1200.0
     params = [
         # Only one dataset now 
@@ -38,13 +41,19 @@ class PegasosQsvcBenchmarks(PegasosQsvcBaseClassifierBenchmark):
     ]
     param_names = ["dataset", "backend"]
 
+    # unpickled models and memory mapped training kernel matrices shared by all the benchmark
+    # instances
+    _model_cache: Dict[Tuple[str, str], Tuple[PegasosQSVC, np.ndarray]] = {}
+
     def __init__(self) -> None:
         super().__init__()
         self.train_features: Optional[np.ndarray] = None
         self.train_labels: Optional[np.ndarray] = None
         self.test_features: Optional[np.ndarray] = None
         self.test_labels: Optional[np.ndarray] = None
-        self.model: Optional[QuantumKernel] = None 
+        self.model: Optional[PegasosQSVC] = None
+        self.train_kernel_matrix: Optional[np.ndarray] = None
+        self.quantum_instance_name: Optional[str] = None
 
     def setup(self, dataset: str, quantum_instance_name: str) -> None:
         """Set up the benchmark."""
@@ -53,23 +62,55 @@ class PegasosQsvcBenchmarks(PegasosQsvcBaseClassifierBenchmark):
         self.test_features = self.datasets[dataset]["test_features"]
         self.test_labels = self.datasets[dataset]["test_labels"]
 
-        n_qubits = self.train_features.shape[1]
-        if dataset == DATASET_SYNTHETIC_CLASSIFICATION:
-            _kernel = self._construct_QuantumKernel_classical_classifier(quantum_instance_name= quantum_instance_name, 
-                                                                            num_qubits = n_qubits) #this is just a kernel matrix
-            model = PegasosQSVC(kernel = _kernel.evaluate)
-           
-        elif dataset == DATASET_IRIS_CLASSIFICATION:
-            _kernel = self._construct_QuantumKernel_classical_classifier(quantum_instance_name= quantum_instance_name, 
-                                                                            num_qubits = n_qubits) #this is just a kernel matrix
-            model = PegasosQSVC(kernel = _kernel.evaluate)
-            
-        else:
+        if dataset not in (DATASET_SYNTHETIC_CLASSIFICATION, DATASET_IRIS_CLASSIFICATION):
             raise ValueError(f"Unsupported dataset: {dataset}")
-            
-        file_name = f"PegasosQsvc_{dataset}_{quantum_instance_name}.pickle"
-        with open(file_name, "rb") as file:
-            self.result = pickle.load(file)
+        self.quantum_instance_name = quantum_instance_name
+
+        key = (dataset, quantum_instance_name)
+        if key not in self._model_cache:
+            file_name = f"PegasosQsvc_{dataset}_{quantum_instance_name}"
+            with open(f"{file_name}.pickle", "rb") as file:
+                model = pickle.load(file)
+            train_kernel_matrix = np.load(f"{file_name}_K.npy", mmap_mode="r")
+            # with a precomputed kernel predict never uses _x_train, it only slices it and drops
+            # the result; restore a non-None value so that slice does not raise a TypeError
+            model._x_train = train_kernel_matrix  # pylint: disable=protected-access
+            self._model_cache[key] = model, train_kernel_matrix
+        self.model, self.train_kernel_matrix = self._model_cache[key]
+
+        # drop the test kernel, predictions and scores cached for the previous parameters
+        self.__dict__.pop("test_kernel_matrix", None)
+        self.__dict__.pop("_test_predicts", None)
+        self.__dict__.pop("_test_scores", None)
+
+    @cached_property
+    def test_kernel_matrix(self) -> np.ndarray:
+        """Kernel between the test and the training set, evaluated only for the track_* metrics.
+
+        The model is fitted on a precomputed kernel, so predict/score take the kernel between
+        the samples and the whole training set.
+        """
+        _kernel = self._construct_QuantumKernel_classical_classifier(
+            quantum_instance_name=self.quantum_instance_name,
+            num_qubits=self.train_features.shape[1],
+        )
+        return (
+            self._evaluate_kernel_matrix(_kernel, self.test_features, self.train_features)
+            + PEGASOS_KERNEL_OFFSET
+        ).astype(np.float32)
+
+    @cached_property
+    def _test_predicts(self) -> np.ndarray:
+        """Test set predictions, computed once and shared across all the track_* metrics."""
+        return self.model.predict(self.test_kernel_matrix)
+
+    @cached_property
+    def _test_scores(self) -> Tuple[float, float, float]:
+        """Micro averaged precision, recall and f1 score of the test set predictions."""
+        precision, recall, f_1, _ = precision_recall_fscore_support(
+            y_true=self.test_labels, y_pred=self._test_predicts, average="micro"
+        )
+        return precision, recall, f_1
             
     def setup_cache(self) -> None:
         """Cache PegasosQsvc fitted model."""
@@ -85,48 +126,54 @@ class PegasosQsvcBenchmarks(PegasosQsvcBaseClassifierBenchmark):
                 _kernel = self._construct_QuantumKernel_classical_classifier(quantum_instance_name= backend, 
                                                                              optimizer = COBYLA(maxiter=200), 
                                                                              num_qubits = n_qubits)
-                model = PegasosQSVC(kernel = _kernel.evaluate)
                 
             elif dataset == DATASET_IRIS_CLASSIFICATION:
                 _kernel = self._construct_QuantumKernel_classical_classifier(quantum_instance_name= backend, 
                                                                              optimizer = COBYLA(maxiter=200), 
                                                                              num_qubits = n_qubits)
-                model = PegasosQSVC(kernel = _kernel.evaluate)
             else:
                 raise ValueError(f"Unsupported dataset: {dataset}")              
-          
-            result = model.fit(train_features, train_labels)
-            file_name = f"PegasosQsvc_{dataset}_{backend}.pickle"
-            with open(file_name, "wb") as file:
-                pickle.dump(result, file)  
+
+            # evaluate the training kernel once, Pegasos then only indexes into it; single
+            # precision is plenty for its stochastic sub-gradient steps
+            train_kernel_matrix = (
+                self._evaluate_kernel_matrix(_kernel, train_features) + PEGASOS_KERNEL_OFFSET
+            ).astype(np.float32)
+            model = PegasosQSVC(C=1.0, num_steps=1000, precomputed=True, seed=42)
+            model.fit(train_kernel_matrix, train_labels)
+            # the kernel matrix is stored apart so that setup can memory map it; fit also keeps
+            # it on the model as _x_train, which a precomputed model never really reads, so drop
+            # that copy from the pickle
+            file_name = f"PegasosQsvc_{dataset}_{backend}"
+            np.save(f"{file_name}_K.npy", train_kernel_matrix)
+            model._x_train = None  # pylint: disable=protected-access
+            with open(f"{file_name}.pickle", "wb") as file:
+                pickle.dump(model, file)
 
     # pylint: disable=invalid-name
     def time_score_PegasosQsvc_classifier(self, _, __):
         """Time scoring PegasosQsvc on data."""
-        self.model.score(self.train_features, self.train_labels)
+        self.model.score(self.train_kernel_matrix, self.train_labels)
 
     def time_predict_PegasosQsvc_classifier(self, _, __):
         """Time predicting with PegasosQsvc."""
-        self.model.predict(self.train_features)
+        self.model.predict(self.train_kernel_matrix)
 
     def track_accuracy_score_PegasosQsvc_classifier(self, _, __):
         """Tracks the overall accuracy of the classification results."""
-        return self.model.score(self.test_features, self.test_labels)
+        return accuracy_score(y_true=self.test_labels, y_pred=self._test_predicts)
 
     def track_precision_score_PegasosQsvc_classifier(self, _, __):
         """Tracks the precision score."""
-        predicts = self.model.predict(self.test_features)
-        return precision_score(y_true=self.test_labels, y_pred=predicts, average="micro")
+        return self._test_scores[0]
 
     def track_recall_score_PegasosQsvc_classifier(self, _, __):
         """Tracks the recall score for each class of the classification results."""
-        predicts = self.model.predict(self.test_features)
-        return recall_score(y_true=self.test_labels, y_pred=predicts, average="micro")
+        return self._test_scores[1]
 
     def track_f1_score_PegasosQsvc_classifier(self, _, __):
         """Tracks the f1 score for each class of the classification results."""
-        predicts = self.model.predict(self.test_features)
-        return f1_score(y_true=self.test_labels, y_pred=predicts, average="micro")
+        return self._test_scores[2]
 
 if __name__ == "__main__":
     bench = PegasosQsvcBenchmarks()
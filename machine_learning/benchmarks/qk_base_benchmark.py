@@ -20,8 +20,7 @@ from qiskit.circuit.library import ZZFeatureMap
 from qiskit_machine_learning.kernels import QuantumKernel
 from qiskit_machine_learning.kernels.algorithms import QuantumKernelTrainer
 from qiskit_machine_learning.algorithms import QSVC
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder, FunctionTransformer
+from sklearn.preprocessing import FunctionTransformer
 from qiskit import QuantumCircuit
 import numpy as np
 from qiskit.utils import algorithm_globals
@@ -31,12 +30,14 @@ from .base_classifier_benchmark import BaseClassifierBenchmark
 class QKernelBaseClassifierBenchmark(BaseClassifierBenchmark, ABC):
     """Base class for quantum kernel benchmarks."""
     def __init__(self) -> None:
-        reshaper = FunctionTransformer(lambda x: x.reshape(-1, 1))
-        encoder = OneHotEncoder(sparse=False)
+        # one hot encode the integer labels with a plain lookup, one column per class
+        encoder = FunctionTransformer(
+            lambda y: np.eye(int(y.max()) + 1)[y.ravel().astype(np.intp)], validate=False
+        )
         super().__init__(
-            synthetic_label_encoder=Pipeline([("reshape", reshaper), ("one hot", encoder)]),
+            synthetic_label_encoder=encoder,
             iris_num_classes=2,
-            iris_label_encoder=Pipeline([("reshape", reshaper), ("one hot", encoder)]),
+            iris_label_encoder=encoder,
         )
         
     def _construct_QuantumKernel_classical_classifier(self,                                             
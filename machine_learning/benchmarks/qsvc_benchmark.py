@@ -22,7 +22,6 @@ from qiskit.algorithms.optimizers import COBYLA
 #from qiskit_machine_learning.algorithms import NeuralNetworkClassifier
 from qiskit_machine_learning.algorithms import QSVC
 from sklearn.metrics import precision_score, recall_score, f1_score
-from sympy import evaluate
 
 from .base_classifier_benchmark import DATASET_SYNTHETIC_CLASSIFICATION, DATASET_IRIS_CLASSIFICATION
 from .qsvc_base_benchmark import QsvcBaseClassifierBenchmark